@@ -1,13 +1,94 @@
-import requests
+import asyncio
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from ollama_pool import ollama_pool
+from prescore import compute_features, is_clear_fail, build_fail_report, describe_features
+
+OLLAMA_CHAT_PATH = '/api/chat'
+
+# Transcripts longer than this (in characters) are evaluated segment by segment,
+# keeping each prompt well inside phi3's context window
+SEGMENT_CHARS = int(os.getenv('ANALYSIS_SEGMENT_CHARS', 3000))
+
+# Report returned to the frontend when the model call or JSON parsing fails
+FAILED_ANALYSIS = {
+    "scores": {
+        "english": 0, "technical": 0, "communication": 0, 
+        "teamwork": 0, "soft_skills": 0, "project": 0, "overall": 0
+    },
+    "feedback": {
+        "strengths": "Analysis failed. Please try again.",
+        "improvements": "N/A",
+        "english_assessment": "N/A",
+        "recommendations": "N/A"
+    }
+}
+
 
 def analyze_session(history, job_role="Candidate"):
     """
     Analyzes the interview/hackathon session history and generates a performance report.
+    Long transcripts are split into turn-aligned segments that are evaluated in parallel.
     """
-    
-    # Format history for the prompt
-    conversation_text = ""
+    report, segments = prepare_analysis(history)
+    if report:
+        return report
+
+    prompts = [prompt for prompt, _ in segments]
+    with ThreadPoolExecutor(max_workers=min(len(prompts), analysis_parallelism())) as executor:
+        reports = list(executor.map(evaluate_prompt, prompts))
+
+    return merge_reports(reports, [weight for _, weight in segments])
+
+
+def prepare_analysis(history):
+    """
+    Everything analyze_session and analyze_session_async share before the model
+    is called. Returns (report, []) when the session is scored by rule, or
+    (None, [(prompt, weight), ...]) with one evaluation prompt per segment.
+    """
+    background_context, turns = parse_transcript(history)
+
+    # Clear-fail sessions are scored by rule, without a model call
+    features = compute_features(turns)
+    if is_clear_fail(features):
+        return build_fail_report(features), []
+
+    segments = split_turns(turns)
+    if len(segments) <= 1:
+        return None, [(build_segment_prompt(background_context, turns, features), candidate_word_count(turns))]
+
+    return None, [
+        (build_segment_prompt(background_context, segment), candidate_word_count(segment))
+        for segment in segments
+    ]
+
+
+def evaluate_prompt(system_prompt):
+    """Run one evaluation prompt through the model and parse the JSON report"""
+    try:
+        # Use the chat endpoint which is more reliable for instruction following
+        response = ollama_pool.post(OLLAMA_CHAT_PATH, build_analysis_payload(system_prompt))
+        
+        if response.status_code == 200:
+            return parse_analysis_response(response.json()['message']['content'])
+        else:
+            print(f"Ollama API Error: {response.status_code} - {response.text}")
+            return None
+            
+    except Exception as e:
+        print(f"Analysis Error: {e}")
+        return None
+
+
+def parse_transcript(history):
+    """
+    Splits the session history into the uploaded background context and
+    (role, content) turns, with the injected context removed from the answers.
+    """
+    turns = []
     background_context = ""
 
     for msg in history:
@@ -28,8 +109,112 @@ def analyze_session(history, job_role="Candidate"):
                 # Fallback if format is unexpected
                 content = content.replace("Context from uploaded file:", "[Background Info Provided]").strip()
 
-        conversation_text += f"{role}: {content}\n"
+        # The frontend appends the user's message to the history before /api/chat
+        # appends it again, so every answer arrives twice in a row
+        if role == "Candidate" and turns and turns[-1][0] == role and turns[-1][1].strip() == content.strip():
+            continue
+
+        turns.append((role, content))
+
+    return background_context, turns
+
+
+def build_segment_prompt(background_context, turns, features=None):
+    """Evaluator prompt for some turns, including their pre-computed statistics"""
+    features = features or compute_features(turns)
+    return render_analysis_prompt(background_context, format_turns(turns), describe_features(features))
+
+
+def format_turns(turns):
+    return "".join(f"{role}: {content}\n" for role, content in turns)
+
+
+def split_turns(turns, max_chars=None):
+    """
+    Splits turns into segments of roughly `max_chars` characters. Segments only
+    break before an Interviewer turn, so each question stays with its answer.
+    """
+    max_chars = max_chars or SEGMENT_CHARS
+    segments = [[]]
+    size = 0
+
+    for role, content in turns:
+        if role == "Interviewer" and segments[-1] and size >= max_chars:
+            segments.append([])
+            size = 0
+        segments[-1].append((role, content))
+        size += len(role) + len(content) + 3
+
+    # A short tail is not worth its own model call
+    if len(segments) > 1 and len(format_turns(segments[-1])) < max_chars // 4:
+        segments[-2].extend(segments.pop())
+
+    return segments
 
+
+def candidate_word_count(turns):
+    return sum(len(content.split()) for role, content in turns if role == "Candidate")
+
+
+def analysis_parallelism():
+    """
+    How many segments to evaluate at once: every model server times the
+    requests each one serves in parallel (OLLAMA_NUM_PARALLEL), unless overridden.
+    """
+    per_backend = int(os.getenv('OLLAMA_NUM_PARALLEL', 1))
+    return int(os.getenv('ANALYSIS_PARALLELISM', 0)) or len(ollama_pool.backends) * per_backend
+
+
+def is_valid_report(report):
+    """True if a parsed model reply has the scores/feedback objects a report needs"""
+    return (isinstance(report, dict)
+            and isinstance(report.get("scores"), dict)
+            and isinstance(report.get("feedback"), dict))
+
+
+def merge_reports(reports, weights):
+    """
+    Combines per-segment reports into one report of the same shape. Scores are
+    averaged, weighted by how much the candidate said in each segment; feedback
+    from every segment is kept, without repeats. If any segment failed, the
+    whole analysis fails rather than scoring part of the transcript.
+    """
+    if not reports or not all(is_valid_report(report) for report in reports):
+        return None
+
+    scored = [(report, max(weight, 1)) for report, weight in zip(reports, weights)]
+
+    scores = {}
+    for key in FAILED_ANALYSIS["scores"]:
+        weighted = 0
+        total = 0
+        for report, weight in scored:
+            # Missing or non-numeric scores ("N/A") are left out of the average
+            try:
+                value = float(report["scores"][key])
+            except (KeyError, TypeError, ValueError):
+                continue
+            weighted += value * weight
+            total += weight
+        scores[key] = round(weighted / total) if total else 0
+
+    feedback = {}
+    for key in FAILED_ANALYSIS["feedback"]:
+        parts = []
+        for report, _ in scored:
+            text = str(report["feedback"].get(key, "")).strip()
+            if text and text not in parts:
+                parts.append(text)
+        feedback[key] = " ".join(parts) or "N/A"
+
+    return {"scores": scores, "feedback": feedback}
+
+
+def render_analysis_prompt(background_context, conversation_text, features_text="Not available."):
+    """
+    Fills the evaluator prompt with the background context, a transcript and
+    the transcript statistics from the pre-scoring pass.
+    """
     system_prompt = f"""
     You are a STRICT Interview Evaluator. You are NOT helpful. You are NOT polite. You are a critical grader.
     
@@ -39,6 +224,9 @@ def analyze_session(history, job_role="Candidate"):
     ACTUAL INTERVIEW TRANSCRIPT (EVALUATE THIS ONLY):
     {conversation_text}
     
+    TRANSCRIPT STATISTICS (MEASURED, USE THEM WHEN SCORING):
+    {features_text}
+    
     ⚠️ SCORING RULES (READ CAREFULLY):
     1. **IGNORE THE RESUME FOR SCORING.** A good resume with a bad interview = 0 SCORE.
     2. **AUTOMATIC FAIL CONDITIONS (Score 0-20):**
@@ -83,39 +271,69 @@ def analyze_session(history, job_role="Candidate"):
     }}
     """
 
+    return system_prompt
+
+
+async def analyze_session_async(history, client, job_role="Candidate"):
+    """
+    Same as analyze_session, but awaits the model through a shared httpx.AsyncClient.
+    """
+    report, segments = prepare_analysis(history)
+    if report:
+        return report
+
+    limit = asyncio.Semaphore(analysis_parallelism())
+
+    async def evaluate_segment(prompt):
+        async with limit:
+            return await evaluate_prompt_async(client, prompt)
+
+    reports = await asyncio.gather(*(evaluate_segment(prompt) for prompt, _ in segments))
+    return merge_reports(reports, [weight for _, weight in segments])
+
+
+async def evaluate_prompt_async(client, system_prompt):
+    """Non-blocking version of evaluate_prompt"""
     try:
-        # Use the chat endpoint which is more reliable for instruction following
-        response = requests.post('http://localhost:11434/api/chat', json={
-            "model": "phi3:3.8b", 
-            "messages": [
-                {"role": "system", "content": system_prompt}
-            ],
-            "stream": False,
-            "options": {
-                "temperature": 0.2, # Lower temperature for more consistent JSON
-                "num_predict": 1000
-            }
-        })
-        
+        response = await ollama_pool.post_async(client, OLLAMA_CHAT_PATH, build_analysis_payload(system_prompt))
+
         if response.status_code == 200:
-            result = response.json()
-            response_text = result['message']['content']
-            try:
-                # clean up potential markdown code blocks if the model adds them
-                if "```json" in response_text:
-                    response_text = response_text.split("```json")[1].split("```")[0]
-                elif "```" in response_text:
-                    response_text = response_text.split("```")[1].split("```")[0]
-                
-                return json.loads(response_text.strip())
-            except json.JSONDecodeError:
-                print("Error parsing JSON from AI response")
-                print(f"Raw response: {response_text}")
-                return None
+            return parse_analysis_response(response.json()['message']['content'])
         else:
             print(f"Ollama API Error: {response.status_code} - {response.text}")
             return None
-            
+
     except Exception as e:
         print(f"Analysis Error: {e}")
         return None
+
+
+def build_analysis_payload(system_prompt):
+    """Ollama chat payload for the evaluation prompt"""
+    return {
+        "model": "phi3:3.8b", 
+        "messages": [
+            {"role": "system", "content": system_prompt}
+        ],
+        "stream": False,
+        "options": {
+            "temperature": 0.2, # Lower temperature for more consistent JSON
+            "num_predict": 1000
+        }
+    }
+
+
+def parse_analysis_response(response_text):
+    """Parse the model's JSON report, returning None if it is malformed"""
+    try:
+        # clean up potential markdown code blocks if the model adds them
+        if "```json" in response_text:
+            response_text = response_text.split("```json")[1].split("```")[0]
+        elif "```" in response_text:
+            response_text = response_text.split("```")[1].split("```")[0]
+        
+        return json.loads(response_text.strip())
+    except json.JSONDecodeError:
+        print("Error parsing JSON from AI response")
+        print(f"Raw response: {response_text}")
+        return None
@@ -0,0 +1,221 @@
+"""
+Async (ASGI) serving mode for the Prepy AI backend.
+
+Serves the same endpoints as app.py, but model calls are awaited through a
+shared httpx.AsyncClient and PDF/PPTX parsing runs in a process pool, so a
+single worker can hold hundreds of sessions that are waiting on Ollama.
+
+Run with:
+    hypercorn asgi_app:app --bind 0.0.0.0:5000
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+from dotenv import load_dotenv
+from quart import Quart, request, jsonify
+from quart_cors import cors
+from werkzeug.utils import secure_filename
+
+# Load environment variables before the modules below read their settings
+load_dotenv()
+
+from extraction import (
+    UPLOAD_FOLDER, allowed_file, unique_upload_path,
+    extract_text_from_pdf, extract_text_from_ppt,
+)
+from prompts import (
+    OLLAMA_CHAT_PATH, get_welcome_message, build_session_data, build_chat_history,
+    build_ollama_payload, extract_question,
+)
+from analysis import analyze_session_async, FAILED_ANALYSIS
+from ollama_pool import ollama_pool
+from context_budget import context_budget
+
+app = Quart(__name__)
+app = cors(app)
+
+app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
+
+# Ollama can take well over a minute for a full evaluation
+OLLAMA_TIMEOUT = httpx.Timeout(300.0, connect=10.0)
+EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', os.cpu_count() or 2))
+
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+# Created when the server starts, shared by every request
+http_client = None
+extraction_pool = None
+
+
+@app.before_serving
+async def startup():
+    global http_client, extraction_pool
+    http_client = httpx.AsyncClient(timeout=OLLAMA_TIMEOUT)
+    extraction_pool = ProcessPoolExecutor(max_workers=EXTRACTION_WORKERS)
+    ollama_pool.start_health_checks_async(http_client)
+
+
+@app.after_serving
+async def shutdown():
+    # Stop the health checks before closing the client they use
+    await ollama_pool.stop_health_checks_async()
+    await http_client.aclose()
+    extraction_pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def call_ollama_api_async(messages, system_prompt, session_id=None):
+    """Non-blocking version of call_ollama_api in app.py"""
+    try:
+        payload = build_ollama_payload(messages, system_prompt)
+
+        response = await ollama_pool.post_async(http_client, OLLAMA_CHAT_PATH, payload, session_id=session_id)
+        response.raise_for_status()
+
+        result = response.json()
+        return extract_question(result['message']['content'])
+    except Exception as e:
+        print(f"Ollama API Error: {e}")
+        return f"Error communicating with AI: {str(e)}"
+
+
+async def extract_text(file_path, filename):
+    """Parse the uploaded document in the process pool"""
+    # The original filename only decides which extractor to use
+    extractor = extract_text_from_pdf if filename.endswith('.pdf') else extract_text_from_ppt
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(extraction_pool, extractor, file_path)
+
+
+@app.route('/api/upload', methods=['POST'])
+async def upload_file():
+    """Handle file upload and initial analysis"""
+    files = await request.files
+    form = await request.form
+
+    if 'file' not in files:
+        return jsonify({'error': 'No file provided'}), 400
+
+    file = files['file']
+    prep_type = form.get('type', 'interview')
+    difficulty = form.get('mode', 'hulk')
+    job_role = form.get('job_role', '')
+
+    if file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+
+    if file and allowed_file(file.filename):
+        filename = secure_filename(file.filename)
+        file_path = unique_upload_path(filename)
+        await file.save(file_path)
+
+        try:
+            extracted_text = await extract_text(file_path, filename)
+        finally:
+            # Clean up uploaded file
+            os.remove(file_path)
+
+        return jsonify({
+            'success': True,
+            'message': get_welcome_message(prep_type),
+            'extracted_text': extracted_text[:500],  # Send preview
+            'session_data': build_session_data(prep_type, difficulty, job_role, extracted_text)
+        })
+
+    return jsonify({'error': 'Invalid file type'}), 400
+
+
+@app.route('/api/chat', methods=['POST'])
+async def chat():
+    """Handle chat messages during evaluation"""
+    data = await request.get_json()
+    user_message = data.get('message', '')
+    system_prompt = data.get('system_prompt', '')
+
+    if not user_message:
+        return jsonify({'error': 'No message provided'}), 400
+
+    conversation_history = build_chat_history(data)
+
+    # Only the document context, a summary and the latest turns go to the model
+    session_id = data.get('session_id')
+    prompt_messages = context_budget.build_messages(session_id, conversation_history, data.get('extracted_text', ''))
+
+    ai_response = await call_ollama_api_async(prompt_messages, system_prompt, session_id)
+
+    # Add AI response to history
+    conversation_history.append({'role': 'assistant', 'content': ai_response})
+
+    return jsonify({
+        'success': True,
+        'message': ai_response,
+        'history': conversation_history
+    })
+
+
+@app.route('/api/analyze-session', methods=['POST'])
+async def analyze_session_endpoint():
+    data = await request.get_json()
+    history = data.get('history', [])
+    job_role = data.get('job_role', 'Candidate')
+
+    if not history:
+        return jsonify({"success": False, "error": "No history provided"}), 400
+
+    analysis_result = await analyze_session_async(history, http_client, job_role)
+
+    if analysis_result:
+        return jsonify({"success": True, "data": analysis_result})
+    else:
+        # Fallback data if AI fails
+        return jsonify({
+            "success": False,
+            "error": "Analysis failed",
+            "data": FAILED_ANALYSIS
+        })
+
+
+@app.route('/api/save-recording', methods=['POST'])
+async def save_recording():
+    """Save session recording to HACKATHONRECORDINGS folder"""
+    try:
+        files = await request.files
+        if 'recording' not in files:
+            return jsonify({'error': 'No recording provided'}), 400
+
+        recording = files['recording']
+
+        # Create HACKATHONRECORDINGS folder if it doesn't exist
+        recordings_folder = os.path.join(os.path.dirname(__file__), '..', 'HACKATHONRECORDINGS')
+        os.makedirs(recordings_folder, exist_ok=True)
+
+        # Save the recording
+        filename = secure_filename(recording.filename)
+        filepath = os.path.join(recordings_folder, filename)
+        await recording.save(filepath)
+
+        print(f"✅ Recording saved: {filepath}")
+
+        return jsonify({
+            'success': True,
+            'message': 'Recording saved successfully',
+            'filepath': filepath,
+            'filename': filename
+        })
+    except Exception as e:
+        print(f"❌ Error saving recording: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/health', methods=['GET'])
+async def health_check():
+    """Health check endpoint"""
+    return jsonify({'status': 'healthy', 'message': 'Backend is running'})
+
+
+if __name__ == '__main__':
+    print("Starting Prepy AI Backend Server (async)...")
+    print("Server running on http://localhost:5000")
+    app.run(host='0.0.0.0', port=5000)
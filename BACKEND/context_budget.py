@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from ollama_pool import ollama_pool
+
+CONTEXT_MARKER = "Context from uploaded file:"
+RESPONSE_MARKER = "User's response:"
+
+SUMMARY_PROMPT = """You keep running notes on a practice interview.
+Update the notes with the new turns. Keep what the candidate said about their
+background, projects and skills, and which topics the interviewer already asked about.
+Write plain sentences, at most 120 words. Return ONLY the updated notes."""
+
+# Summaries are short; a backend that takes longer than this is treated as hung
+SUMMARY_TIMEOUT = float(os.getenv('SUMMARY_TIMEOUT', 60))
+
+
+def strip_document_context(content):
+    """Remove the uploaded-file context that /api/chat injects into early user messages"""
+    if CONTEXT_MARKER in content and RESPONSE_MARKER in content:
+        return content.split(RESPONSE_MARKER, 1)[1].strip()
+    return content
+
+
+def format_turns(messages):
+    return "\n".join(
+        f"{'Interviewer' if msg['role'] == 'assistant' else 'Candidate'}: {msg['content']}"
+        for msg in messages
+    )
+
+
+def summarize_turns(summary, messages):
+    """Fold `messages` into the running `summary` with a short model call"""
+    payload = {
+        'model': 'phi3:3.8b',
+        'messages': [
+            {'role': 'system', 'content': SUMMARY_PROMPT},
+            {'role': 'user', 'content': f"Current notes:\n{summary or 'None yet.'}\n\nNew turns:\n{format_turns(messages)}"}
+        ],
+        'stream': False,
+        'options': {
+            'num_predict': 200,
+            'temperature': 0.2
+        }
+    }
+    response = ollama_pool.post('/api/chat', payload, timeout=SUMMARY_TIMEOUT)
+    response.raise_for_status()
+    return response.json()['message']['content'].strip()
+
+
+class ContextBudget:
+    """
+    Keeps the prompt for each chat turn roughly constant in size.
+
+    The prompt is the document context, a rolling summary of older turns and
+    the last `recent_messages` messages verbatim. When messages fall out of the
+    recent window they are folded into the summary by a background job; until
+    that job finishes they are still sent verbatim. If the job has been running
+    for more than `stall_seconds`, they are left out so the prompt stays bounded.
+    At most `recent_messages` of them are ever sent.
+    """
+
+    def __init__(self, summarize=summarize_turns, recent_messages=7, max_sessions=10000, workers=2,
+                 stall_seconds=SUMMARY_TIMEOUT):
+        if recent_messages < 1:
+            raise ValueError("ContextBudget needs recent_messages >= 1")
+        self.summarize = summarize
+        self.recent_messages = recent_messages
+        self.max_sessions = max_sessions
+        self.summaries = OrderedDict()  # session_id -> (number of messages folded, summary text)
+        self.stall_seconds = stall_seconds
+        self.pending = {}  # session_id -> time the running fold started
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='summarizer')
+
+    @classmethod
+    def from_env(cls):
+        """Build from CHAT_RECENT_MESSAGES and SUMMARY_WORKERS"""
+        return cls(
+            recent_messages=int(os.getenv('CHAT_RECENT_MESSAGES', 7)),
+            workers=int(os.getenv('SUMMARY_WORKERS', 2)),
+        )
+
+    def build_messages(self, session_id, history, extracted_text=''):
+        """Messages to send to the model (without the system prompt) for this turn"""
+        messages = [
+            {'role': msg['role'], 'content': strip_document_context(msg['content'])}
+            for msg in history
+        ]
+        split = max(len(messages) - self.recent_messages, 0)
+        older = messages[:split]
+        recent = messages[split:]
+
+        prompt = []
+        if extracted_text:
+            prompt.append({'role': 'system', 'content': f"{CONTEXT_MARKER}\n{extracted_text[:2000]}"})
+
+        if not session_id:
+            # No way to keep a summary between turns: just bound the window
+            return prompt + recent
+
+        with self.lock:
+            folded, summary = self.summaries.get(session_id, (0, ''))
+            if session_id in self.summaries:
+                self.summaries.move_to_end(session_id)
+            started = self.pending.get(session_id)
+            if len(older) > folded and started is None:
+                self.pending[session_id] = time.monotonic()
+                self.executor.submit(self._fold, session_id, folded, summary, older[folded:])
+            stalled = started is not None and time.monotonic() - started > self.stall_seconds
+
+        if summary:
+            prompt.append({'role': 'system', 'content': f"Summary of the conversation so far:\n{summary}"})
+
+        if stalled:
+            # The summarizer is stuck: fall back to the bounded window
+            return prompt + recent
+
+        # Turns that have left the window but are not summarized yet, capped in
+        # case summaries keep failing
+        backlog = older[folded:]
+        return prompt + backlog[max(len(backlog) - self.recent_messages, 0):] + recent
+
+    def _fold(self, session_id, folded, summary, new_messages):
+        try:
+            summary = self.summarize(summary, new_messages)
+        except Exception as e:
+            print(f"Summarization Error: {e}")
+            with self.lock:
+                self.pending.pop(session_id, None)
+            return
+
+        with self.lock:
+            self.pending.pop(session_id, None)
+            self.summaries[session_id] = (folded + len(new_messages), summary)
+            self.summaries.move_to_end(session_id)
+            while len(self.summaries) > self.max_sessions:
+                self.summaries.popitem(last=False)
+
+
+# Shared by the Flask app and the ASGI app
+context_budget = ContextBudget.from_env()
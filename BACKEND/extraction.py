@@ -0,0 +1,55 @@
+"""
+Text extraction from uploaded PDF and PowerPoint files, shared by the Flask
+and ASGI apps.
+"""
+import os
+import uuid
+
+import PyPDF2
+
+from pptx_extract import extract_text_from_pptx
+
+UPLOAD_FOLDER = 'uploads'
+ALLOWED_EXTENSIONS = {'pdf', 'ppt', 'pptx'}
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def unique_upload_path(filename):
+    """Path for an upload that concurrent uploads of the same filename cannot collide with"""
+    # Keep the extension: the extractors pick their parser from it
+    return os.path.join(UPLOAD_FOLDER, f"{uuid.uuid4().hex}_{filename}")
+
+def extract_text_from_pdf(file_path):
+    """Extract text from PDF file"""
+    text = ""
+    try:
+        with open(file_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            for page in pdf_reader.pages:
+                text += page.extract_text() + "\n"
+    except Exception as e:
+        print(f"Error extracting PDF: {e}")
+    return text
+
+def extract_text_from_ppt(file_path):
+    """Extract text from PowerPoint file"""
+    # Fast path: stream slide XML straight out of the .pptx zip
+    if file_path.lower().endswith('.pptx'):
+        try:
+            return extract_text_from_pptx(file_path)
+        except Exception as e:
+            print(f"Fast PPTX extraction failed, falling back to python-pptx: {e}")
+    
+    text = ""
+    try:
+        # Imported lazily: python-pptx is slow to import and rarely needed
+        from pptx import Presentation
+        prs = Presentation(file_path)
+        for slide in prs.slides:
+            for shape in slide.shapes:
+                if hasattr(shape, "text"):
+                    text += shape.text + "\n"
+    except Exception as e:
+        print(f"Error extracting PPT: {e}")
+    return text
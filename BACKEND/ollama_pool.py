@@ -0,0 +1,234 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import httpx
+import requests
+
+DEFAULT_OLLAMA_URL = 'http://localhost:11434'
+
+
+class OllamaBackend:
+    """
+    One Ollama server plus the bookkeeping used to route requests to it.
+    """
+
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.healthy = True
+        self.latency = None  # moving average of request latency in seconds
+
+    def score(self):
+        """Lower is better: in-flight requests first, then observed latency"""
+        return (self.outstanding, self.latency if self.latency is not None else 0.0)
+
+    def __repr__(self):
+        state = 'up' if self.healthy else 'ejected'
+        return f"<OllamaBackend {self.url} {state} outstanding={self.outstanding}>"
+
+
+class OllamaPool:
+    """
+    Routes model calls across several Ollama servers.
+
+    Requests go to the healthy backend with the fewest outstanding requests
+    (ties broken by latency). A session sticks to the backend it first used so
+    Ollama can reuse its KV cache. Backends that fail `max_failures` times in a
+    row are ejected until an active health check sees them answer again.
+    """
+
+    def __init__(self, urls, max_failures=3, health_interval=10, max_sessions=10000):
+        if not urls:
+            raise ValueError("OllamaPool needs at least one backend URL")
+        self.backends = [OllamaBackend(url) for url in urls]
+        self.max_failures = max_failures
+        self.health_interval = health_interval
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()  # session_id -> OllamaBackend
+        self.lock = threading.Lock()
+        self._health_lock = threading.Lock()
+        self._health_thread = None
+        self._health_task = None
+
+    @classmethod
+    def from_env(cls):
+        """Build a pool from OLLAMA_URLS (comma-separated base URLs)"""
+        urls = os.getenv('OLLAMA_URLS', DEFAULT_OLLAMA_URL)
+        return cls(
+            [url.strip() for url in urls.split(',') if url.strip()],
+            max_failures=int(os.getenv('OLLAMA_MAX_FAILURES', 3)),
+            health_interval=float(os.getenv('OLLAMA_HEALTH_INTERVAL', 10)),
+        )
+
+    # --- Routing ---
+
+    def acquire(self, session_id=None, exclude=()):
+        """Pick a backend for a request and count it as outstanding"""
+        # However the app is served, ejected backends need health checks to come back
+        self.start_health_checks()
+
+        with self.lock:
+            candidates = [b for b in self.backends if b.healthy and b not in exclude]
+            if not candidates:
+                # Everything is ejected: keep trying rather than failing outright
+                candidates = [b for b in self.backends if b not in exclude] or self.backends
+
+            backend = self.sessions.get(session_id) if session_id else None
+            if backend not in candidates:
+                backend = min(candidates, key=OllamaBackend.score)
+
+            if session_id:
+                self.sessions[session_id] = backend
+                self.sessions.move_to_end(session_id)
+                while len(self.sessions) > self.max_sessions:
+                    self.sessions.popitem(last=False)
+
+            backend.outstanding += 1
+            return backend
+
+    def release(self, backend, ok, latency=None):
+        """Record the outcome of a request started with acquire() (ok=None: no verdict)"""
+        with self.lock:
+            backend.outstanding -= 1
+            if ok is None:
+                return
+            if ok:
+                backend.consecutive_failures = 0
+                if latency is not None:
+                    backend.latency = latency if backend.latency is None else 0.8 * backend.latency + 0.2 * latency
+            else:
+                self._record_failure(backend)
+
+    def _record_failure(self, backend):
+        backend.consecutive_failures += 1
+        if backend.healthy and backend.consecutive_failures >= self.max_failures:
+            backend.healthy = False
+            print(f"⚠️ Ejecting Ollama backend {backend.url}")
+
+    def _record_health(self, backend, ok):
+        with self.lock:
+            if ok:
+                if not backend.healthy:
+                    print(f"✅ Ollama backend recovered: {backend.url}")
+                backend.healthy = True
+                backend.consecutive_failures = 0
+            else:
+                self._record_failure(backend)
+
+    # --- Requests ---
+
+    def post(self, path, payload, session_id=None, **kwargs):
+        """
+        POST to a backend and return the requests.Response.
+        Connection errors are retried on the other backends.
+        """
+        tried = []
+        while True:
+            backend = self.acquire(session_id, exclude=tried)
+            start = time.monotonic()
+            try:
+                response = requests.post(backend.url + path, json=payload, **kwargs)
+            except requests.ConnectionError:
+                self.release(backend, ok=False)
+                tried.append(backend)
+                if len(tried) >= len(self.backends):
+                    raise
+                continue
+            except Exception:
+                self.release(backend, ok=False)
+                raise
+            self.release(backend, ok=response.status_code < 500, latency=time.monotonic() - start)
+            return response
+
+    async def post_async(self, client, path, payload, session_id=None, **kwargs):
+        """Same as post(), awaiting the request through an httpx.AsyncClient"""
+        tried = []
+        while True:
+            backend = self.acquire(session_id, exclude=tried)
+            start = time.monotonic()
+            try:
+                response = await client.post(backend.url + path, json=payload, **kwargs)
+            except httpx.ConnectError:
+                self.release(backend, ok=False)
+                tried.append(backend)
+                if len(tried) >= len(self.backends):
+                    raise
+                continue
+            except httpx.HTTPError:
+                self.release(backend, ok=False)
+                raise
+            except BaseException:
+                # Cancelled by the caller: says nothing about the backend's health
+                self.release(backend, ok=None)
+                raise
+            self.release(backend, ok=response.status_code < 500, latency=time.monotonic() - start)
+            return response
+
+    # --- Active health checks ---
+
+    def check_health(self):
+        """Ping every backend once"""
+        for backend in self.backends:
+            try:
+                ok = requests.get(backend.url + '/api/tags', timeout=5).status_code == 200
+            except requests.RequestException:
+                ok = False
+            self._record_health(backend, ok)
+
+    async def check_health_async(self, client):
+        """Ping every backend once without blocking the event loop"""
+        for backend in self.backends:
+            try:
+                ok = (await client.get(backend.url + '/api/tags', timeout=5)).status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            self._record_health(backend, ok)
+
+    def start_health_checks(self):
+        """
+        Run check_health() every `health_interval` seconds in a daemon thread,
+        unless checks are already running (in a thread or as an asyncio task).
+        """
+        with self._health_lock:
+            if self._health_thread is not None or self._health_task is not None:
+                return
+
+            def loop():
+                while True:
+                    self.check_health()
+                    time.sleep(self.health_interval)
+
+            self._health_thread = threading.Thread(target=loop, name='ollama-health', daemon=True)
+            self._health_thread.start()
+
+    def start_health_checks_async(self, client):
+        """Async counterpart of start_health_checks(): runs the checks as a task on the current loop"""
+        with self._health_lock:
+            if self._health_thread is not None or self._health_task is not None:
+                return
+            self._health_task = asyncio.create_task(self.run_health_checks_async(client))
+
+    async def stop_health_checks_async(self):
+        """Cancel the task started by start_health_checks_async()"""
+        task, self._health_task = self._health_task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def run_health_checks_async(self, client):
+        """Ping the backends every `health_interval` seconds until cancelled"""
+        while True:
+            await self.check_health_async(client)
+            await asyncio.sleep(self.health_interval)
+
+
+# Shared by the Flask app, the ASGI app and the analysis module
+ollama_pool = OllamaPool.from_env()
@@ -0,0 +1,65 @@
+"""
+Fast text extraction for .pptx decks.
+
+Reads slide XML straight out of the OOXML zip with an incremental parser
+instead of building a python-pptx object model, so images and layouts are
+never loaded. Text inside tables and grouped shapes is picked up as well.
+"""
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+
+NS_A = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+NS_P = 'http://schemas.openxmlformats.org/presentationml/2006/main'
+NS_R = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+NS_REL = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+TAG_PARAGRAPH = f'{{{NS_A}}}p'
+TAG_TEXT = f'{{{NS_A}}}t'
+TAG_BREAK = f'{{{NS_A}}}br'
+
+
+def slide_paths(deck):
+    """Slide part names in presentation order"""
+    rels = ET.fromstring(deck.read('ppt/_rels/presentation.xml.rels'))
+    targets = {}
+    for rel in rels.iter(f'{{{NS_REL}}}Relationship'):
+        target = rel.get('Target')
+        # Targets are usually relative to ppt/, but may be absolute part names
+        path = target.lstrip('/') if target.startswith('/') else posixpath.join('ppt', target)
+        targets[rel.get('Id')] = posixpath.normpath(path)
+
+    presentation = ET.fromstring(deck.read('ppt/presentation.xml'))
+    return [
+        targets[sld_id.get(f'{{{NS_R}}}id')]
+        for sld_id in presentation.iter(f'{{{NS_P}}}sldId')
+    ]
+
+
+def iter_slide_text(slide_xml):
+    """Yield each non-empty paragraph of a slide, parsing incrementally"""
+    parts = []
+    for event, elem in ET.iterparse(slide_xml, events=('end',)):
+        if elem.tag == TAG_TEXT:
+            parts.append(elem.text or '')
+        elif elem.tag == TAG_BREAK:
+            parts.append('\n')
+        elif elem.tag == TAG_PARAGRAPH:
+            paragraph = ''.join(parts).strip()
+            parts = []
+            if paragraph:
+                yield paragraph
+            elem.clear()
+
+
+def iter_slides(file_path):
+    """Yield the text of each slide of a .pptx file, in slide order"""
+    with zipfile.ZipFile(file_path) as deck:
+        for path in slide_paths(deck):
+            with deck.open(path) as slide_xml:
+                yield '\n'.join(iter_slide_text(slide_xml))
+
+
+def extract_text_from_pptx(file_path):
+    """Extract all slide text from a .pptx file"""
+    return ''.join(slide + '\n' for slide in iter_slides(file_path) if slide)
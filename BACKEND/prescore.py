@@ -0,0 +1,183 @@
+"""
+Rule-based pre-scoring of a session transcript.
+
+Computes cheap per-answer statistics before the evaluation model is called.
+Sessions that clearly hit the automatic-fail rules of the evaluation prompt
+get their report straight from these statistics; for everything else the
+statistics are handed to the model alongside the transcript.
+"""
+import re
+
+WORD_RE = re.compile(r"[a-z0-9']+")
+
+# Salutations and small talk only. Short acknowledgements ("yes", "ok") are
+# legitimate answers to yes/no questions and only count as short answers.
+GREETINGS = {
+    'hi', 'hii', 'hello', 'hey', 'heya', 'howdy', 'greetings', 'yo', 'sup',
+    'bye', 'bby', 'goodbye', 'thanks', 'sir', 'madam', 'maam', 'mam',
+}
+GREETING_PHRASES = [
+    ('how', 'are', 'you'), ('how', 'r', 'u'), ("how's", 'it', 'going'), ('how', 'is', 'it', 'going'),
+    ("what's", 'up'), ('whats', 'up'), ('good', 'morning'), ('good', 'afternoon'),
+    ('good', 'evening'), ('good', 'night'), ('nice', 'to', 'meet', 'you'), ('thank', 'you'),
+    ('see', 'you'),
+]
+FILLERS = {
+    'um', 'umm', 'uh', 'uhh', 'erm', 'hmm', 'like', 'basically', 'actually',
+    'literally', 'so', 'well', 'just', 'kinda', 'sorta', 'whatever',
+}
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'but', 'is', 'are', 'was', 'were', 'be', 'been',
+    'do', 'does', 'did', 'you', 'your', 'i', 'me', 'my', 'we', 'our', 'it', 'its',
+    'this', 'that', 'these', 'those', 'of', 'to', 'in', 'on', 'for', 'with', 'at',
+    'by', 'from', 'about', 'as', 'what', 'which', 'who', 'how', 'why', 'when',
+    'where', 'can', 'could', 'would', 'should', 'will', 'have', 'has', 'had',
+    'tell', 'explain', 'describe', 'give', 'us', 'some', 'any', 'there',
+}
+
+# Automatic-fail thresholds, mirroring the rules in the evaluation prompt
+MIN_TOTAL_WORDS = 25
+SHORT_ANSWER_WORDS = 3
+MAX_GREETING_RATIO = 0.8
+MAX_GREETING_SESSION_WORDS = 2 * MIN_TOTAL_WORDS
+
+
+def words(text):
+    return WORD_RE.findall(text.lower())
+
+
+def is_greeting(answer_words):
+    """True if an answer is nothing but salutations and small talk ("hi", "how are you", ...)"""
+    i = 0
+    while i < len(answer_words):
+        if answer_words[i] in GREETINGS:
+            i += 1
+            continue
+        phrase = next((p for p in GREETING_PHRASES if tuple(answer_words[i:i + len(p)]) == p), None)
+        if phrase is None:
+            return False
+        i += len(phrase)
+    return bool(answer_words)
+
+
+def relevance(question, answer_words):
+    """Share of the question's content words that the answer picks up"""
+    keywords = {word for word in words(question) if word not in STOPWORDS and len(word) > 2}
+    if not keywords:
+        return None
+    return len(keywords & set(answer_words)) / len(keywords)
+
+
+def compute_features(turns):
+    """
+    Statistics over (role, content) turns, as produced by analysis.parse_transcript.
+    """
+    answers = []
+    question = ''
+    for role, content in turns:
+        if role == 'Interviewer':
+            question = content
+        else:
+            answers.append((question, words(content)))
+
+    word_counts = [len(answer_words) for _, answer_words in answers]
+    total_words = sum(word_counts)
+    overlaps = [
+        overlap for overlap in (relevance(q, answer_words) for q, answer_words in answers)
+        if overlap is not None
+    ]
+
+    return {
+        'answers': len(answers),
+        'word_counts': word_counts,
+        'total_words': total_words,
+        'average_words': total_words / len(answers) if answers else 0,
+        'short_answers': sum(1 for count in word_counts if count <= SHORT_ANSWER_WORDS),
+        'greeting_ratio': sum(1 for _, a in answers if is_greeting(a)) / len(answers) if answers else 0,
+        'filler_ratio': sum(1 for _, a in answers for w in a if w in FILLERS) / total_words if total_words else 0,
+        'relevance': sum(overlaps) / len(overlaps) if overlaps else 0,
+    }
+
+
+def clear_fail_reason(features):
+    """
+    Which automatic-fail condition of the evaluation prompt the transcript meets
+    without doubt ('no_answers', 'low_word_count', 'short_answers' or 'greetings'),
+    or None if it needs the model.
+    """
+    if features['answers'] == 0:
+        return 'no_answers'
+    if features['total_words'] < MIN_TOTAL_WORDS:
+        return 'low_word_count'
+    if features['short_answers'] == features['answers']:
+        return 'short_answers'
+    # Mostly greetings, and not enough said elsewhere to be worth a model call
+    if (features['greeting_ratio'] >= MAX_GREETING_RATIO
+            and features['total_words'] < MAX_GREETING_SESSION_WORDS):
+        return 'greetings'
+    return None
+
+
+def is_clear_fail(features):
+    """True when the transcript meets the prompt's automatic-fail conditions without doubt"""
+    return clear_fail_reason(features) is not None
+
+
+def describe_fail(features, reason):
+    """The "improvements" feedback for a clear-fail session, worded after the rule that fired"""
+    answers = features['answers']
+    if reason == 'no_answers':
+        return "The candidate did not answer any of the questions."
+    if reason == 'low_word_count':
+        return (
+            f"The candidate spoke only {features['total_words']} words across {answers} "
+            f"answer{'s' if answers != 1 else ''}, far too little to assess. "
+            f"Answers need much more detail."
+        )
+    if reason == 'short_answers':
+        return (
+            f"Every answer was {SHORT_ANSWER_WORDS} words or fewer. "
+            f"One-word or one-line answers do not show any knowledge."
+        )
+    return (
+        f"{features['greeting_ratio']:.0%} of the answers were greetings or small talk "
+        f"instead of answers to the questions asked."
+    )
+
+
+def build_fail_report(features, reason=None):
+    """A report in the usual scores/feedback shape for a clear-fail session (all scores under 20)"""
+    reason = reason or clear_fail_reason(features)
+    base = min(15, features['total_words'] // 3)
+    english = min(19, base + (3 if features['filler_ratio'] < 0.1 else 0))
+
+    return {
+        "scores": {
+            "english": english,
+            "technical": min(base, 10),
+            "communication": base,
+            "teamwork": min(base, 10),
+            "soft_skills": base,
+            "project": min(base, 10),
+            "overall": base
+        },
+        "feedback": {
+            "strengths": "None observed.",
+            "improvements": describe_fail(features, reason),
+            "english_assessment": "Insufficient data.",
+            "recommendations": "Answer each question in full sentences, with specific details and examples from your own work."
+        }
+    }
+
+
+def describe_features(features):
+    """Plain-text summary of the statistics for the evaluation prompt"""
+    counts = ', '.join(str(count) for count in features['word_counts']) or 'none'
+    return (
+        f"- Candidate answers: {features['answers']} (words per answer: {counts})\n"
+        f"    - Total candidate words: {features['total_words']}, average {features['average_words']:.0f} per answer\n"
+        f"    - Answers of {SHORT_ANSWER_WORDS} words or fewer: {features['short_answers']}\n"
+        f"    - Greeting-only answers: {features['greeting_ratio']:.0%}\n"
+        f"    - Filler words: {features['filler_ratio']:.0%} of all words\n"
+        f"    - Average overlap between question keywords and answers: {features['relevance']:.0%}"
+    )
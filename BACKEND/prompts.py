@@ -0,0 +1,138 @@
+"""
+Interviewer prompts and chat helpers, shared by the Flask and ASGI apps.
+"""
+import re
+import uuid
+
+OLLAMA_CHAT_PATH = '/api/chat'
+
+def get_system_prompt(prep_type, difficulty, job_role=None):
+    """Generate system prompt based on prep type, difficulty, and job role"""
+    
+    # Base prompts for each prep type
+    base_prompts = {
+   'interview': f"""You are an AI Interviewer{' for the position of ' + job_role if job_role else ''}.
+
+⚠️ ABSOLUTE RULES - BREAKING THESE WILL FAIL THE TASK:
+1. Your response MUST be EXACTLY ONE SHORT QUESTION
+2. MAXIMUM 10 WORDS - Count them!
+3. NO multiple questions - NO "and", NO commas separating questions
+4. NO introductions, NO explanations, NO statements
+5. Start directly with the question
+6. End with a question mark
+
+EXAMPLES OF CORRECT RESPONSES:
+- "What technologies did you use?"
+- "How does it work?"
+- "What problem does this solve?"
+
+EXAMPLES OF WRONG RESPONSES (TOO LONG):
+- "Can you explain the architecture and how it scales?" (TWO questions!)
+- "What specific features does your project incorporate to ensure accuracy?" (TOO LONG!)
+
+Your goal: Ask ONE simple, direct question (max 10 words){' about the job role: ' + job_role if job_role else ''}.""",
+        
+        'hackathon': """You are a Hackathon Judge evaluating projects.
+
+⚠️ ABSOLUTE RULES - BREAKING THESE WILL FAIL THE TASK:
+1. Your response MUST be EXACTLY ONE SHORT QUESTION
+2. MAXIMUM 10 WORDS - Count them!
+3. NO multiple questions - NO "and", NO commas separating questions
+4. NO introductions, NO explanations, NO statements
+5. Start directly with the question
+6. End with a question mark
+
+EXAMPLES OF CORRECT RESPONSES:
+
+- "what is the total build cost of this porject?"
+- "How long did development take?"
+- "How did your team collaborate?"
+
+EXAMPLES OF WRONG RESPONSES (TOO LONG):
+- "What features does it have and what are the limitations?" (TWO questions!)
+- "How can you improve this project in future iterations?" (TOO LONG!)
+
+Your goal: Ask ONE simple, direct question (max 10 words) about the project."""
+    }
+    
+    # Difficulty modifiers - SIMPLIFIED
+    difficulty_modifiers = {
+        'superman': "Ask basic questions. Example: 'What does it do?'",
+        'batman': "Ask practical questions. Example: 'How does it work?'",
+        'hulk': "Ask technical questions. Example: 'What's the algorithm?'"
+    }
+    
+
+    
+    base = base_prompts.get(prep_type, base_prompts['interview'])
+    modifier = difficulty_modifiers.get(difficulty, difficulty_modifiers['hulk'])
+    
+    return f"{base}\n\n{modifier}"
+
+
+def get_welcome_message(prep_type):
+    """Fixed opening message for a new session"""
+    # Use fixed welcome message instead of AI-generated one
+    if prep_type == 'interview':
+        return "Welcome to PREPY AI Interview. Give an Introduction about yourself."
+    return "Welcome to PREPY AI Hackathon. Now Start with your project explanation."
+
+def build_session_data(prep_type, difficulty, job_role, extracted_text):
+    """Session data handed back to the frontend after an upload"""
+    # Store the extracted text in session data for future questions
+    return {
+        'prep_type': prep_type,
+        'difficulty': difficulty,
+        'session_id': uuid.uuid4().hex,  # keeps the session on one Ollama backend
+        'system_prompt': get_system_prompt(prep_type, difficulty, job_role),
+        'extracted_text': extracted_text
+    }
+
+def build_chat_history(data):
+    """Append the user's message (with document context early on) to the history"""
+    user_message = data.get('message', '')
+    conversation_history = data.get('history', [])
+    extracted_text = data.get('extracted_text', '')
+    
+    # Add user message to history
+    conversation_history.append({'role': 'user', 'content': user_message})
+    
+    # Add context about uploaded content if this is early in conversation
+    if len(conversation_history) <= 3 and extracted_text:
+        context_message = f"Context from uploaded file:\n{extracted_text[:2000]}\n\nUser's response: {user_message}"
+        conversation_history[-1]['content'] = context_message
+    
+    return conversation_history
+
+def build_ollama_payload(messages, system_prompt):
+    """Build the Ollama chat payload for an interviewer turn"""
+    # Format messages for Ollama
+    formatted_messages = [{'role': 'system', 'content': system_prompt}] + messages
+    
+    return {
+        'model': 'phi3:3.8b',
+        'messages': formatted_messages,
+        'stream': False,
+        'options': {
+            'num_predict': 60,  # Allow enough tokens to generate the full thought
+            'temperature': 0.7,
+            'top_p': 0.9
+        }
+    }
+
+def extract_question(content):
+    """Reduce a raw model reply to the single question it asks"""
+    content = content.strip()
+    
+    # --- POST-PROCESSING: Extract ONLY the question ---
+    # 1. If there's a question mark, take everything up to the first one
+    if '?' in content:
+        content = content.split('?')[0] + '?'
+        
+    # 2. If there are multiple sentences (split by . or !), take the last part
+    # This removes "Intro text. Question?" -> "Question?"
+    sentences = re.split(r'[.!]\s+', content)
+    if sentences:
+        content = sentences[-1].strip()
+        
+    return content
@@ -0,0 +1,54 @@
+from analysis import parse_transcript, prepare_analysis
+from prescore import compute_features, clear_fail_reason, build_fail_report
+from prompts import build_chat_history
+
+
+def run_session(answers, questions, extracted_text="Resume: Python developer"):
+    """Build the history the way FRONTEND/main.js and /api/chat do"""
+    history = []
+    for answer, question in zip(answers, questions):
+        # main.js pushes the message itself, then sends the history to /api/chat
+        history.append({'role': 'user', 'content': answer})
+        history = build_chat_history({'message': answer, 'history': history, 'extracted_text': extracted_text})
+        history.append({'role': 'assistant', 'content': question})
+    return history
+
+
+def test_answers_are_counted_once():
+    answers = ["I am Priya, a developer.", "I use Python daily.", "Flask and Postgres mostly.", "Yes, I wrote tests."]
+    history = run_session(answers, ["What do you use?", "Which frameworks?", "Any tests?", "Thanks."])
+
+    background_context, turns = parse_transcript(history)
+    features = compute_features(turns)
+
+    assert background_context == "Resume: Python developer"
+    assert features['answers'] == 4
+    assert features['total_words'] == 17
+    assert clear_fail_reason(features) == 'low_word_count'
+
+    report, segments = prepare_analysis(history)
+    assert segments == []
+    assert report['scores']['overall'] < 20
+
+
+def test_yes_no_answers_are_not_greetings():
+    answers = ["Yes.", "No.", "Yes.", "No.",
+               "The scheduler reads jobs from a Kafka topic, keeps state in Postgres with row locks, "
+               "and workers poll for due jobs, retry failures with backoff and publish completion events."]
+    history = run_session(answers, ["Did you use Kafka?"] * 5)
+
+    features = compute_features(parse_transcript(history)[1])
+
+    assert features['greeting_ratio'] == 0
+    assert clear_fail_reason(features) is None
+
+
+def test_fail_report_names_the_rule_that_fired():
+    turns = [('Interviewer', 'Introduce yourself.'), ('Candidate', 'I am Priya, a backend developer working with Python.')]
+    report = build_fail_report(compute_features(turns))
+    assert "only 9 words" in report['feedback']['improvements']
+    assert "did not answer" not in report['feedback']['improvements']
+
+    turns = [('Interviewer', 'What did you build?'), ('Candidate', 'hello sir, good morning, how are you')] * 5
+    report = build_fail_report(compute_features(turns))
+    assert "greetings" in report['feedback']['improvements']
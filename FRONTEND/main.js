@@ -415,7 +415,8 @@ async function sendMessage() {
                 message: msg,
                 history: conversationHistory,
                 system_prompt: currentSystemPrompt,
-                extracted_text: sessionData?.extracted_text || ''
+                extracted_text: sessionData?.extracted_text || '',
+                session_id: sessionData?.session_id || ''
             })
         });
 